@@ -1,6 +1,5 @@
 import numpy as np
-from collections import deque
-from scipy.optimize import minimize
+from scipy.optimize import least_squares
 
 class SelfCalibrator:
     """
@@ -8,7 +7,12 @@ class SelfCalibrator:
     and scale factors using real IMU measurements
     """
     def __init__(self, window_size=1000):
-        self.window = deque(maxlen=window_size)
+        # Ring buffers of the most recent samples, one row per sample
+        self.window_size = window_size
+        self._accel_buf = np.empty((window_size, 3), dtype=np.float32)
+        self._gyro_buf = np.empty((window_size, 3), dtype=np.float32)
+        self._head = 0
+        self._count = 0
         self.is_calibrated = False
         self.calibration_data = {
             'accel_bias': np.zeros(3),
@@ -21,18 +25,74 @@ class SelfCalibrator:
         
     def add_sample(self, accel, gyro):
         """Add new IMU sample to calibration window"""
-        self.window.append((accel.copy(), gyro.copy()))
+        self._accel_buf[self._head] = accel
+        self._gyro_buf[self._head] = gyro
+        self._head = (self._head + 1) % self.window_size
+        self._count = min(self._count + 1, self.window_size)
         
-        if len(self.window) > 100:
+        if self._count > 100:
             self._detect_stationary()
             
-        if len(self.window) == self.window.maxlen:
+        if self._count == self.window_size:
             self._auto_calibrate()
     
+    def ingest_batch(self, accel, gyro):
+        """
+        Add a block of (M, 3) samples, equivalent to add_sample() on each
+        row, then run the calibration fit once over the window
+        """
+        accel = np.asarray(accel, dtype=np.float32)
+        gyro = np.asarray(gyro, dtype=np.float32)
+        n = len(accel)
+        
+        # Each new sample's stationary check looks at the 50 samples ending
+        # at it, so up to 49 buffered samples are put in front of the batch
+        n_prev = min(self._count, 49)
+        prev = np.arange(self._head - n_prev, self._head)
+        hist_accel = np.concatenate([np.take(self._accel_buf, prev, axis=0, mode='wrap'), accel])
+        hist_gyro = np.concatenate([np.take(self._gyro_buf, prev, axis=0, mode='wrap'), gyro])
+        first_checked = max(0, 100 - self._count)
+        
+        keep = min(n, self.window_size)
+        rows = (self._head + np.arange(n - keep, n)) % self.window_size
+        self._accel_buf[rows] = accel[n - keep:]
+        self._gyro_buf[rows] = gyro[n - keep:]
+        self._head = (self._head + n) % self.window_size
+        self._count = min(self._count + n, self.window_size)
+        
+        if self.window_size > 100 and first_checked < n:
+            self._detect_stationary_batch(hist_accel, hist_gyro, n_prev + first_checked - 49)
+        
+        self._auto_calibrate()
+    
+    def _detect_stationary_batch(self, accel, gyro, first_window):
+        """
+        _detect_stationary for every 50-sample window of accel/gyro starting
+        at first_window or later; the last stationary window wins, as it
+        would sample by sample
+        """
+        windows_accel = np.lib.stride_tricks.sliding_window_view(accel, 50, axis=0)[first_window:]
+        windows_gyro = np.lib.stride_tricks.sliding_window_view(gyro, 50, axis=0)[first_window:]
+        
+        accel_var = np.var(windows_accel, axis=2).mean(axis=1)
+        gyro_var = np.var(windows_gyro, axis=2).mean(axis=1)
+        
+        stationary = np.flatnonzero(
+            (accel_var < self.calibration_data['stationary_threshold']) &
+            (gyro_var < 0.001)
+        )
+        if len(stationary):
+            last = stationary[-1]
+            self.stationary_accel = windows_accel[last].mean(axis=1)
+            self.stationary_gyro = windows_gyro[last].mean(axis=1)
+            
+            self.calibration_data['gravity_magnitude'] = np.linalg.norm(self.stationary_accel)
+    
     def _detect_stationary(self):
         """Detect when device is stationary using variance"""
-        recent_accel = np.array([a for a, _ in list(self.window)[-50:]])
-        recent_gyro = np.array([g for _, g in list(self.window)[-50:]])
+        recent = np.arange(self._head - 50, self._head)
+        recent_accel = np.take(self._accel_buf, recent, axis=0, mode='wrap')
+        recent_gyro = np.take(self._gyro_buf, recent, axis=0, mode='wrap')
         
         accel_var = np.var(recent_accel, axis=0)
         gyro_var = np.var(recent_gyro, axis=0)
@@ -49,25 +109,34 @@ class SelfCalibrator:
         """Perform full 6-point calibration automatically"""
         print("Auto-calibration in progress...")
         
-        all_accel = np.array([a for a, _ in self.window])
-        all_gyro = np.array([g for _, g in self.window])
+        # Sample order is irrelevant to the fit, so the filled part of the
+        # ring buffer is used as-is
+        all_accel = self._accel_buf[:self._count]
         
+        # Mean stationary reading, in the rad/s of the samples fed in
         self.calibration_data['gyro_bias'] = self.stationary_gyro
+        gravity = self.calibration_data['gravity_magnitude']
+        
+        def residuals(params):
+            corrected = (all_accel - params[:3]) * params[3:6]
+            return np.linalg.norm(corrected, axis=1) - gravity
         
-        def cost_function(params):
+        def jacobian(params):
             bias = params[:3]
             scale = params[3:6]
             
-            corrected = (all_accel - bias) * scale
-            norms = np.linalg.norm(corrected, axis=1)
+            centered = all_accel - bias
+            corrected = centered * scale
+            unit = corrected / np.linalg.norm(corrected, axis=1)[:, None]
             
-            return np.mean((norms - self.calibration_data['gravity_magnitude'])**2)
+            # d|c|/db = -s * c/|c|,  d|c|/ds = (a - b) * c/|c|
+            return np.hstack([-scale * unit, centered * unit])
         
         initial_guess = np.concatenate([np.zeros(3), np.ones(3)])
         
         try:
-            result = minimize(cost_function, initial_guess, method='Nelder-Mead', 
-                           options={'maxiter': 1000, 'xatol': 1e-8})
+            result = least_squares(residuals, initial_guess, jac=jacobian,
+                                   method='trf', xtol=1e-8)
             
             if result.success and np.all(np.isfinite(result.x)):
                 self.calibration_data['accel_bias'] = result.x[:3]
@@ -25,39 +25,88 @@ class MPU6050:
         self.bus.write_byte_data(self.address, 0x1B, 0x08)  # Gyro: ±500°/s
         self.bus.write_byte_data(self.address, 0x1C, 0x08)  # Accel: ±4g
         
+        # Sensitivity at the configured ranges (units per LSB)
+        self._accel_lsb = np.float32(9.81 / 8192.0)
+        self._gyro_lsb = np.float32(np.pi / 180.0 / 65.5)  # rad/s
+        
         # Calibration parameters
-        self.accel_bias = np.zeros(3)
-        self.gyro_bias = np.zeros(3)
-        self.accel_scale = np.ones(3)
-        self.gyro_scale = np.ones(3)
+        self.set_calibration(np.zeros(3), np.zeros(3), np.ones(3), np.ones(3))
         
     def read_raw(self) -> Tuple[np.ndarray, np.ndarray, float]:
         data = self.bus.read_i2c_block_data(self.address, 0x3B, 14)
         
-        accel = np.array([
-            self._twos_complement(data[0] << 8 | data[1]) / 8192.0 * 9.81,
-            self._twos_complement(data[2] << 8 | data[3]) / 8192.0 * 9.81,
-            self._twos_complement(data[4] << 8 | data[5]) / 8192.0 * 9.81
-        ])
+        # 7 big-endian int16 words: accel xyz, temperature, gyro xyz
+        raw = np.frombuffer(bytes(data), dtype='>i2')
         
-        temp = self._twos_complement(data[6] << 8 | data[7]) / 340.0 + 36.53
+        # Sensitivity and calibration are folded into one offset and gain
+        accel = (raw[0:3] - self._accel_offset) * self._accel_gain
+        temp = float(raw[3]) / 340.0 + 36.53
+        gyro = (raw[4:7] - self._gyro_offset) * self._gyro_gain
         
-        gyro = np.array([
-            self._twos_complement(data[8] << 8 | data[9]) / 65.5,
-            self._twos_complement(data[10] << 8 | data[11]) / 65.5,
-            self._twos_complement(data[12] << 8 | data[13]) / 65.5
-        ])
+        return IMUData(time.time(), accel, gyro, temp)
+    
+    def enable_fifo(self):
+        """
+        Pace the sensor at 100Hz and buffer samples in the on-chip FIFO,
+        for reading with read_fifo. The FIFO holds about 73 frames, so once
+        enabled it must be drained at least every 0.7s
+        """
+        self.bus.write_byte_data(self.address, 0x1A, 0x01)  # DLPF: 1kHz gyro rate
+        self.bus.write_byte_data(self.address, 0x19, 0x09)  # Sample rate: 1kHz / (1 + 9)
+        self.bus.write_byte_data(self.address, 0x23, 0xF8)  # FIFO: temp, gyro xyz, accel
+        self.bus.write_byte_data(self.address, 0x6A, 0x44)  # Enable and reset FIFO
+    
+    def read_fifo(self, n_samples) -> IMUData:
+        """
+        Drain up to n_samples buffered samples from the FIFO in one I2C
+        transaction; enable_fifo() must have been called first. Returns an
+        IMUData whose accel/gyro are axis-major (3, n) arrays, one contiguous
+        row per axis, and temp an (n,) array, oldest sample first.
+        """
+        count = self.bus.read_i2c_block_data(self.address, 0x72, 2)
+        fifo_count = count[0] << 8 | count[1]
         
-        accel = (accel - self.accel_bias) * self.accel_scale
-        gyro = (gyro - self.gyro_bias) * self.gyro_scale
+        if fifo_count >= 1024:
+            # FIFO overflowed and frame alignment is lost, start over
+            self.bus.write_byte_data(self.address, 0x6A, 0x44)
+            fifo_count = 0
         
-        return IMUData(time.time(), accel, np.radians(gyro), temp)
-    
-    def _twos_complement(self, val):
-        return val - 65536 if val >= 32768 else val
+        n = min(fifo_count // 14, n_samples)
+        if n == 0:
+            return IMUData(time.time(), np.empty((3, 0), np.float32),
+                           np.empty((3, 0), np.float32), np.empty(0))
+        
+        # SMBus block reads stop at 32 bytes, so use a raw write/read pair
+        write = smbus2.i2c_msg.write(self.address, [0x74])
+        read = smbus2.i2c_msg.read(self.address, n * 14)
+        self.bus.i2c_rdwr(write, read)
+        
+        # Frames follow the register order of read_raw: accel, temp, gyro
+        raw = np.frombuffer(bytes(read), dtype='>i2').reshape(n, 7)
+        
+        # Repack once into contiguous per-channel rows
+        raw = np.ascontiguousarray(raw.T, dtype=np.float32)
+        
+        accel = (raw[0:3] - self._accel_offset[..., None]) * self._accel_gain[..., None]
+        temp = raw[3] / 340.0 + 36.53
+        gyro = (raw[4:7] - self._gyro_offset[..., None]) * self._gyro_gain[..., None]
+        
+        return IMUData(time.time(), accel, gyro, temp)
     
     def set_calibration(self, accel_bias, gyro_bias, accel_scale, gyro_scale):
+        """
+        Apply calibration in output units: accel_bias in m/s² and gyro_bias
+        in rad/s, the units read_raw/read_fifo return (and so the units of
+        SelfCalibrator's estimates, which are taken from those readings).
+        Scales are dimensionless. Both biases are subtracted before scaling
+        """
         self.accel_bias = accel_bias
         self.gyro_bias = gyro_bias
         self.accel_scale = accel_scale
-        self.gyro_scale = gyro_scale
\ No newline at end of file
+        self.gyro_scale = gyro_scale
+        
+        # (raw * lsb - bias) * scale == (raw - bias / lsb) * (lsb * scale)
+        self._accel_offset = np.asarray(accel_bias / self._accel_lsb, dtype=np.float32)
+        self._accel_gain = np.asarray(accel_scale * self._accel_lsb, dtype=np.float32)
+        self._gyro_offset = np.asarray(gyro_bias / self._gyro_lsb, dtype=np.float32)
+        self._gyro_gain = np.asarray(gyro_scale * self._gyro_lsb, dtype=np.float32)
\ No newline at end of file
@@ -1,5 +1,213 @@
 import numpy as np
-from scipy.linalg import expm
+from numba import njit
+
+
+@njit(cache=True, fastmath=True)
+def _rotate_vec(w, x, y, z, v, out):
+    """
+    Rotate v by the unit quaternion (w, x, y, z) without forming the
+    rotation matrix: v' = v + w t + q_vec x t, with t = 2 q_vec x v
+    """
+    tx = 2.0 * (y*v[2] - z*v[1])
+    ty = 2.0 * (z*v[0] - x*v[2])
+    tz = 2.0 * (x*v[1] - y*v[0])
+
+    out[0] = v[0] + w*tx + (y*tz - z*ty)
+    out[1] = v[1] + w*ty + (z*tx - x*tz)
+    out[2] = v[2] + w*tz + (x*ty - y*tx)
+
+
+@njit(cache=True, fastmath=True)
+def _renormalize_quat(q):
+    """
+    Restore |q| = 1. Near unit norm one Newton step of 1/sqrt,
+    q *= 1.5 - 0.5 |q|^2, is used instead of a sqrt and divide; larger
+    deviations (e.g. after a big measurement correction) fall back to an
+    exact normalize
+    """
+    n2 = q[0]*q[0] + q[1]*q[1] + q[2]*q[2] + q[3]*q[3]
+    if abs(1.0 - n2) < 1e-3:
+        q *= 1.5 - 0.5 * n2
+    else:
+        q /= np.sqrt(n2)
+
+
+@njit(cache=True, fastmath=True)
+def _omega(gyro, Omega_out):
+    """Quaternion kinematics matrix for angular rate gyro"""
+    Omega_out[0, 0] = 0.0
+    Omega_out[0, 1] = -gyro[0]
+    Omega_out[0, 2] = -gyro[1]
+    Omega_out[0, 3] = -gyro[2]
+    Omega_out[1, 0] = gyro[0]
+    Omega_out[1, 1] = 0.0
+    Omega_out[1, 2] = gyro[2]
+    Omega_out[1, 3] = -gyro[1]
+    Omega_out[2, 0] = gyro[1]
+    Omega_out[2, 1] = -gyro[2]
+    Omega_out[2, 2] = 0.0
+    Omega_out[2, 3] = gyro[0]
+    Omega_out[3, 0] = gyro[2]
+    Omega_out[3, 1] = gyro[1]
+    Omega_out[3, 2] = -gyro[0]
+    Omega_out[3, 3] = 0.0
+
+
+@njit(cache=True, fastmath=True)
+def _compute_jacobian(gyro, dt, F_out, Omega_buf):
+    """
+    Compute state transition Jacobian. F_out must already hold the
+    constant blocks (identity and the dt position/velocity coupling), so
+    only the gyro-dependent quaternion block is written here
+    """
+    # Simplified Jacobian for quaternion dynamics
+    _omega(gyro, Omega_buf)
+    for i in range(4):
+        for j in range(4):
+            F_out[i, j] = 0.5 * dt * Omega_buf[i, j]
+        F_out[i, i] = 1.0
+
+
+@njit(cache=True, fastmath=True)
+def _measurement_jacobian(q, H_out):
+    """
+    Measurement Jacobian for accelerometer, restricted to the quaternion
+    columns since the other ten columns of H are identically zero
+    """
+    H_out[:] = 0.0
+
+    # Partial derivatives of gravity w.r.t quaternion
+    H_out[0, 0] = 2*q[1]
+    H_out[0, 1] = 2*q[2]
+    H_out[0, 2] = 2*q[3]
+    H_out[1, 1] = 2*q[0]
+    H_out[1, 3] = 2*q[3]
+    H_out[2, 0] = 2*q[0]
+    H_out[2, 2] = 2*q[1]
+    H_out[2, 3] = 2*q[2]
+
+
+@njit(cache=True, fastmath=True)
+def _cholesky_solve(S, B, L, X):
+    """
+    Solve S X = B for symmetric positive definite S, writing X in place; L
+    is an (n, n) work array for the factor. S is only 3x3 here, so the
+    factorisation is done inline instead of through LAPACK
+    """
+    n, m = B.shape
+
+    # Cholesky factor S = L L^T (only the lower triangle is read)
+    for i in range(n):
+        for j in range(i + 1):
+            acc = S[i, j]
+            for k in range(j):
+                acc -= L[i, k] * L[j, k]
+            if i == j:
+                L[i, i] = np.sqrt(acc)
+            else:
+                L[i, j] = acc / L[j, j]
+
+    for k in range(m):
+        # Forward substitution: L z = b
+        for i in range(n):
+            acc = B[i, k]
+            for j in range(i):
+                acc -= L[i, j] * X[j, k]
+            X[i, k] = acc / L[i, i]
+        # Back substitution: L^T x = z
+        for i in range(n - 1, -1, -1):
+            acc = X[i, k]
+            for j in range(i + 1, n):
+                acc -= L[j, i] * X[j, k]
+            X[i, k] = acc / L[i, i]
+
+
+@njit(cache=True, fastmath=True)
+def _ekf_predict(state, P, Q, gyro, accel, dt, F_buf, Omega_buf, v_buf):
+    """Prediction step, updating state and P in place"""
+    gyro_corrected = gyro - state[10:13]
+
+    _omega(gyro_corrected, Omega_buf)
+    q_dot = Omega_buf @ state[0:4]
+    state[0:4] += q_dot * (0.5 * dt)
+    _renormalize_quat(state[0:4])
+
+    _rotate_vec(state[0], state[1], state[2], state[3], accel, v_buf)
+    v_buf[2] -= 9.81
+
+    state[7:10] += v_buf * dt
+    state[4:7] += state[7:10] * dt
+
+    _compute_jacobian(gyro_corrected, dt, F_buf, Omega_buf)
+    P[:] = F_buf @ P @ F_buf.T + Q
+
+
+@njit(cache=True, fastmath=True)
+def _ekf_predict_batch(state, P, Q, gyro_block, accel_block, dt, F_buf, Omega_buf, v_buf):
+    """Run the prediction step over consecutive (M, 3) gyro/accel samples"""
+    for i in range(gyro_block.shape[0]):
+        _ekf_predict(state, P, Q, gyro_block[i], accel_block[i], dt,
+                     F_buf, Omega_buf, v_buf)
+
+
+@njit(cache=True, fastmath=True)
+def _ekf_update(state, P, R_meas, accel_meas, g_world, H_buf, v_buf, y_out, S_out,
+                HP_buf, L_buf, Kt_buf):
+    """
+    Accelerometer update, updating state and P in place. HP_buf and Kt_buf
+    are (3, n) and L_buf (3, 3) work arrays, so nothing is allocated
+    """
+    # Expected gravity in the body frame, R^T g, via the conjugate rotation
+    _rotate_vec(state[0], -state[1], -state[2], -state[3], g_world, v_buf)
+    for i in range(3):
+        y_out[i] = accel_meas[i] - v_buf[i]
+
+    # Only the quaternion block of H is non-zero, so H P and H P H^T reduce
+    # to products with the first four rows/columns of P
+    _measurement_jacobian(state[0:4], H_buf)
+    n = P.shape[0]
+    HP = HP_buf
+    HP[:] = 0.0
+    for i in range(3):
+        for k in range(4):
+            h = H_buf[i, k]
+            for j in range(n):
+                HP[i, j] += h * P[k, j]
+    for i in range(3):
+        for j in range(3):
+            acc = R_meas[i, j]
+            for k in range(4):
+                acc += HP[i, k] * H_buf[j, k]
+            S_out[i, j] = acc
+
+    # K = P H^T S^-1, solved as S K^T = H P since P and S are symmetric
+    _cholesky_solve(S_out, HP, L_buf, Kt_buf)
+
+    # state += K y
+    for j in range(n):
+        acc = 0.0
+        for i in range(3):
+            acc += Kt_buf[i, j] * y_out[i]
+        state[j] += acc
+    _renormalize_quat(state[0:4])
+
+    # (I - K H) P == P - K (H P)
+    for i in range(n):
+        for j in range(n):
+            acc = 0.0
+            for k in range(3):
+                acc += Kt_buf[k, i] * HP[k, j]
+            P[i, j] -= acc
+
+
+@njit(cache=True, fastmath=True)
+def _ekf_step(state, P, Q, R_meas, gyro, accel, dt, g_world,
+              F_buf, Omega_buf, H_buf, v_buf, y_out, S_out, HP_buf, L_buf, Kt_buf):
+    """Prediction followed by the accelerometer update in one call"""
+    _ekf_predict(state, P, Q, gyro, accel, dt, F_buf, Omega_buf, v_buf)
+    _ekf_update(state, P, R_meas, accel, g_world, H_buf, v_buf, y_out, S_out,
+                HP_buf, L_buf, Kt_buf)
+
 
 class AdaptiveEKF:
     """
@@ -8,125 +216,99 @@ class AdaptiveEKF:
     """
     def __init__(self):
         # State: [qw, qx, qy, qz, px, py, pz, vx, vy, vz, gx_bias, gy_bias, gz_bias]
-        self.state = np.zeros(13)
+        # Filter arithmetic runs in float32; the 16-bit IMU readings carry far
+        # less precision than that
+        self.state = np.zeros(13, dtype=np.float32)
         self.state[0] = 1.0  # Quaternion w component
-        
+
         # Covariance matrix (uncertainty in estimates)
-        self.P = np.eye(13) * 0.1
-        
-        # Process noise (motion model uncertainty)
-        self.Q = np.eye(13) * 0.001  
-        
-        # Measurement noise (sensor uncertainty)
-        self.R = np.eye(6) * 0.01    
-        
+        self.P = np.eye(13, dtype=np.float32) * np.float32(0.1)
+
+        # Process noise (motion model uncertainty). Q is diagonal and
+        # adaptation only rescales it, so it is adapted through a writable
+        # view of its diagonal
+        self.Q = np.eye(13, dtype=np.float32) * np.float32(0.001)
+        self._Q_diag = np.einsum('ii->i', self.Q)
+
+        # Measurement noise (accelerometer uncertainty)
+        self.R = np.eye(3, dtype=np.float32) * np.float32(0.01)
+
         # Time step (100Hz sampling)
-        self.dt = 0.01  
-        
+        self.dt = 0.01
+
+        # Constant part of the transition Jacobian; the quaternion block is
+        # rewritten every predict step
+        self._F = np.eye(13, dtype=np.float32)
+        self._F[4:7, 7:10] = np.eye(3) * self.dt  # Position/velocity integration
+
+        # Work arrays reused by the compiled predict/update kernels
+        self._H = np.empty((3, 4), dtype=np.float32)
+        self._Omega = np.empty((4, 4), dtype=np.float32)
+        self._g_world = np.array([0.0, 0.0, 9.81], dtype=np.float32)
+        self._v = np.empty(3, dtype=np.float32)
+        self._y = np.empty(3, dtype=np.float32)
+        self._S = np.empty((3, 3), dtype=np.float32)
+        self._HP = np.empty((3, 13), dtype=np.float32)
+        self._L = np.zeros((3, 3), dtype=np.float32)
+        self._Kt = np.empty((3, 13), dtype=np.float32)
+
     def predict(self, gyro, accel):
         """Prediction step with gyro and accelerometer inputs"""
-        q = self.state[0:4]
-        
-        gyro_corrected = gyro - self.state[10:13]
-        
-        Omega = np.array([
-            [0, -gyro_corrected[0], -gyro_corrected[1], -gyro_corrected[2]],
-            [gyro_corrected[0], 0, gyro_corrected[2], -gyro_corrected[1]],
-            [gyro_corrected[1], -gyro_corrected[2], 0, gyro_corrected[0]],
-            [gyro_corrected[2], gyro_corrected[1], -gyro_corrected[0], 0]
-        ])
-        
-        q_dot = 0.5 * Omega @ q
-        self.state[0:4] += q_dot * self.dt
-        self.state[0:4] /= np.linalg.norm(self.state[0:4])  
-        
-        R = self._quat_to_rotmat(q)
-        accel_world = R @ accel - np.array([0, 0, 9.81])
-        
-        self.state[7:10] += accel_world * self.dt  
-        self.state[4:7] += self.state[7:10] * self.dt  
-        
-        F = self._compute_jacobian(gyro_corrected, accel_world)
-        self.P = F @ self.P @ F.T + self.Q
-        
+        _ekf_predict(self.state, self.P, self.Q,
+                     np.asarray(gyro, dtype=np.float32),
+                     np.asarray(accel, dtype=np.float32),
+                     self.dt, self._F, self._Omega, self._v)
+
+    def predict_batch(self, gyro_block, accel_block):
+        """
+        Prediction over a block of M consecutive samples, equivalent to
+        calling predict() on each row but with a single dispatch
+        """
+        _ekf_predict_batch(self.state, self.P, self.Q,
+                           np.ascontiguousarray(gyro_block, dtype=np.float32),
+                           np.ascontiguousarray(accel_block, dtype=np.float32),
+                           self.dt, self._F, self._Omega, self._v)
+
     def update(self, accel_meas):
         """Update using accelerometer as inclinometer"""
-        q = self.state[0:4]
-        R = self._quat_to_rotmat(q)
-        
-        g_world = np.array([0, 0, 9.81])
-        h = R.T @ g_world
-        
-        y = accel_meas - h
-        
-        H = self._measurement_jacobian()
-        S = H @ self.P @ H.T + self.R
-        K = self.P @ H.T @ np.linalg.inv(S)
-        
-        self.state += K @ y
-        self.state[0:4] /= np.linalg.norm(self.state[0:4])  
-        
-        self.P = (np.eye(13) - K @ H) @ self.P
-        
-        self._adapt_noise(y, S)
-        
+        _ekf_update(self.state, self.P, self.R,
+                    np.asarray(accel_meas, dtype=np.float32), self._g_world,
+                    self._H, self._v, self._y, self._S,
+                    self._HP, self._L, self._Kt)
+
+        self._adapt_noise(self._y, self._S)
+
+    def step(self, gyro, accel):
+        """Predict and update with one IMU sample in a single compiled call"""
+        accel = np.asarray(accel, dtype=np.float32)
+        _ekf_step(self.state, self.P, self.Q, self.R,
+                  np.asarray(gyro, dtype=np.float32), accel,
+                  self.dt, self._g_world, self._F, self._Omega,
+                  self._H, self._v, self._y, self._S,
+                  self._HP, self._L, self._Kt)
+
+        self._adapt_noise(self._y, self._S)
+
+    def warmup(self):
+        """
+        Compile the kernels ahead of the first real sample by running them
+        on scratch copies, leaving the filter state untouched
+        """
+        state, P = self.state.copy(), self.P.copy()
+        gyro = np.zeros(3, dtype=np.float32)
+        _ekf_step(state, P, self.Q, self.R, gyro, self._g_world.copy(),
+                  self.dt, self._g_world, self._F, self._Omega,
+                  self._H, self._v, self._y, self._S,
+                  self._HP, self._L, self._Kt)
+
     def _adapt_noise(self, innovation, innovation_cov):
         """Online noise adaptation"""
-        alpha = 0.01  
+        alpha = 0.01
         N = innovation @ innovation.T
-        
+
         if N > 2 * np.trace(innovation_cov):
-            self.Q *= (1 + alpha)
+            self._Q_diag *= (1 + alpha)
         else:
-            self.Q *= (1 - alpha/10)
-        
-        self.Q = np.maximum(self.Q, np.eye(13) * 1e-6)  
-        
-    def _compute_jacobian(self, gyro, accel_world):
-        """Compute state transition Jacobian"""
-        q = self.state[0:4]
-        
-        # Simplified Jacobian for quaternion dynamics
-        F = np.eye(13)
-        
-        # Quaternion state derivatives
-        F[0:4, 0:4] = np.eye(4) + 0.5 * self.dt * np.array([
-            [0, -gyro[0], -gyro[1], -gyro[2]],
-            [gyro[0], 0, gyro[2], -gyro[1]],
-            [gyro[1], -gyro[2], 0, gyro[0]],
-            [gyro[2], gyro[1], -gyro[0], 0]
-        ])
-        
-        # Position/velocity integration
-        R = self._quat_to_rotmat(q)
-        F[4:7, 7:10] = np.eye(3) * self.dt
-        F[7:10, 7:10] = np.eye(3)
-        
-        return F
-    
-    def _measurement_jacobian(self):
-        """Measurement Jacobian for accelerometer"""
-        H = np.zeros((3, 13))
-        q = self.state[0:4]
-        
-        # Partial derivatives of gravity w.r.t quaternion
-        H[0, 0:4] = [2*q[1], 2*q[2], 2*q[3], 0]  
-        H[1, 0:4] = [0, 2*q[0], 0, 2*q[3]]
-        H[2, 0:4] = [2*q[0], 0, 2*q[1], 2*q[2]]
-        
-        return H
-    
-    def _quat_to_rotmat(self, q):
-        """Convert quaternion to rotation matrix"""
-        w, x, y, z = q
-        # Normalize quaternion to prevent numerical instability
-        norm = np.sqrt(w*w + x*x + y*y + z*z)
-        if norm < 1e-10:
-            return np.eye(3)
-        w, x, y, z = w/norm, x/norm, y/norm, z/norm
-        
-        return np.array([
-            [1-2*y*y-2*z*z, 2*x*y-2*w*z, 2*x*z+2*w*y],
-            [2*x*y+2*w*z, 1-2*x*x-2*z*z, 2*y*z-2*w*x],
-            [2*x*z-2*w*y, 2*y*z+2*w*x, 1-2*x*x-2*y*y]
-        ])
\ No newline at end of file
+            self._Q_diag *= (1 - alpha/10)
+
+        np.maximum(self._Q_diag, 1e-6, out=self._Q_diag)
@@ -1,7 +1,11 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, Response
 from fastapi.templating import Jinja2Templates
-import json
+import aiofiles
+import asyncio
+import collections
+import orjson
 import os
 import uvicorn
 
@@ -11,50 +15,106 @@ templates = Jinja2Templates(directory="templates")
 
 hermes_system = None
 
+
+class ORJSONResponse(Response):
+    """
+    JSON response rendered with orjson, serializing ndarrays natively. Kept
+    local: FastAPI's own ORJSONResponse is deprecated, and older releases
+    render without OPT_SERIALIZE_NUMPY
+    """
+    media_type = "application/json"
+
+    def render(self, content):
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+# Parsed signatures.json, reloaded only when the file's mtime changes
+_hist_cache = {'mtime': None, 'data': []}
+
+# Last 20 parsed anomalies and the byte offset anomalies.jsonl was read up to
+_anom = {'offset': 0, 'ring': collections.deque(maxlen=20)}
+# Held across the read and the offset update, so concurrent polls do not
+# read from the same offset and append the same anomalies twice
+_anom_lock = asyncio.Lock()
+
+# dashboard.html is loaded and compiled once; it is still rendered per
+# request, since the template may use request (url_for, host, scheme)
+_index_template = None
+
 @app.get("/")
 async def index(request: Request):
-    return templates.TemplateResponse("dashboard.html", {"request": request})
+    global _index_template
+    if _index_template is None:
+        _index_template = templates.get_template("dashboard.html")
+    return HTMLResponse(_index_template.render({"request": request}))
 
 @app.get("/api/status")
 async def get_status():
     if hermes_system:
-        return JSONResponse(hermes_system.get_status())
-    return JSONResponse({"error": "System not initialized"})
+        return ORJSONResponse(hermes_system.get_status())
+    return ORJSONResponse({"error": "System not initialized"})
 
 @app.get("/api/history")
 async def get_history():
     try:
         if not os.path.exists("signatures.json"):
-            return JSONResponse([])
-        with open("signatures.json", "r") as f:
-            history = json.load(f)
-        return JSONResponse(history[-100:])  # Last 100 samples
+            return ORJSONResponse([])
+        st = os.stat("signatures.json")
+        if st.st_mtime_ns != _hist_cache['mtime']:
+            async with aiofiles.open("signatures.json", "r") as f:
+                _hist_cache['data'] = orjson.loads(await f.read())
+            _hist_cache['mtime'] = st.st_mtime_ns
+        return ORJSONResponse(_hist_cache['data'][-100:])  # Last 100 samples
     except Exception as e:
         print(f"History API error: {e}")
-        return JSONResponse([])
+        return ORJSONResponse([])
 
 @app.get("/api/anomalies")
 async def get_anomalies():
-    anomalies = []
     try:
         if not os.path.exists("anomalies.jsonl"):
-            return JSONResponse([])
-        with open("anomalies.jsonl", "r") as f:
-            for line in f:
+            return ORJSONResponse([])
+        async with _anom_lock:
+            if os.stat("anomalies.jsonl").st_size < _anom['offset']:
+                # File was truncated or rotated, start over
+                _anom['offset'] = 0
+                _anom['ring'].clear()
+            async with aiofiles.open("anomalies.jsonl", "rb") as f:
+                await f.seek(_anom['offset'])
+                chunk = await f.read()
+            # Only consume complete lines; a partially written one is re-read next time
+            end = chunk.rfind(b'\n') + 1
+            _anom['offset'] += end
+            for line in chunk[:end].split(b'\n'):
                 try:
-                    anomalies.append(json.loads(line))
-                except json.JSONDecodeError:
+                    _anom['ring'].append(orjson.loads(line))
+                except orjson.JSONDecodeError:
                     continue
-        return JSONResponse(anomalies[-20:])  # Last 20 anomalies
+            anomalies = list(_anom['ring'])
+        return ORJSONResponse(anomalies)  # Last 20 anomalies
     except Exception as e:
         print(f"Anomalies API error: {e}")
-        return JSONResponse([])
+        return ORJSONResponse([])
 
 @app.get("/api/calibration")
 async def get_calibration():
-    if hermes_system and getattr(hermes_system, "calibrator", None):
-        return JSONResponse(hermes_system.calibrator.get_calibration())
-    return JSONResponse({})
+    if hermes_system:
+        return ORJSONResponse(hermes_system.get_calibration())
+    return ORJSONResponse({})
+
+# Hardware analysis is static, so it is run once on first request
+_hardware_report = None
+
+@app.get("/api/hardware_report")
+async def get_hardware_report():
+    global _hardware_report
+    if _hardware_report is None:
+        from hardware_analysis import HardwareAnalyzer
+        analyzer = HardwareAnalyzer()
+        # The analysis reads the IMU for seconds; keep it off the event loop
+        ready = await run_in_threadpool(analyzer.generate_report)
+        _hardware_report = {'production_ready': ready, 'report': analyzer.report}
+    return ORJSONResponse(_hardware_report)
 
 
 def run_dashboard(system):
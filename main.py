@@ -1,14 +1,67 @@
+import atexit
 import time
 import numpy as np
-import json
+import orjson
 import os
-from datetime import datetime
+import queue
+import signal
+import sys
+import threading
+from datetime import datetime, timezone
 from core.imu_driver import MPU6050
 from core.kalman_filter import AdaptiveEKF
 from core.calibration import SelfCalibrator
 from ml.signature import MotionSignature
 from ml.autoencoder import AnomalyDetector
 
+# Anomaly lines are handed to a writer thread that keeps anomalies.jsonl open
+# and flushes it about once a second, so file IO never runs on the sample
+# loop. The file is only ever appended to, since the dashboard tails it by
+# offset.
+_anom_lock = threading.Lock()
+_anom_queue = queue.Queue()
+_anom_writer = None
+
+def _append_anomaly(line):
+    global _anom_writer
+    with _anom_lock:
+        if _anom_writer is None:
+            _anom_writer = threading.Thread(target=_write_anomalies, daemon=True)
+            _anom_writer.start()
+    _anom_queue.put(line)
+
+def _write_anomalies():
+    with open('anomalies.jsonl', 'ab', buffering=1 << 16) as fp:
+        last_flush = time.monotonic()
+        while True:
+            try:
+                line = _anom_queue.get(timeout=1.0)
+            except queue.Empty:
+                line = b''
+            if line is None:
+                break
+            fp.write(line)
+            if time.monotonic() - last_flush >= 1.0:
+                fp.flush()
+                last_flush = time.monotonic()
+
+def _close_anomaly_log():
+    global _anom_writer
+    with _anom_lock:
+        writer, _anom_writer = _anom_writer, None
+    if writer is not None:
+        # Everything queued before the sentinel is written and the file closed
+        _anom_queue.put(None)
+        writer.join(timeout=5.0)
+
+atexit.register(_close_anomaly_log)
+
+def _handle_sigterm(signum, frame):
+    # Lock-free: the signal may land while this thread holds _anom_lock in
+    # _append_anomaly. SystemExit unwinds that block first, and the log is
+    # then closed by the atexit hook
+    sys.exit(0)
+
 class HermesIMU:
     """
     Main orchestrator
@@ -24,7 +77,16 @@ class HermesIMU:
         
         self.is_initialized = False
         self.motion_history = []
-        self.signature_history = []
+        
+        # Signature history: a ring of the last 1000 window signatures, with
+        # the per-window metadata in parallel arrays
+        history_size = 1000
+        self._sig_ring = np.zeros((history_size, self.anomaly_detector.input_dim), dtype=np.float32)
+        self._sig_time = np.zeros(history_size, dtype=np.int64)  # time.time_ns()
+        self._sig_score = np.zeros(history_size)
+        self._sig_orientation = np.zeros((history_size, 4), dtype=np.float32)
+        self._sig_velocity = np.zeros((history_size, 3), dtype=np.float32)
+        self._sig_pos = 0
         
         self.stats = {
             'samples_processed': 0,
@@ -33,6 +95,12 @@ class HermesIMU:
             'avg_processing_time': 0
         }
         
+        # Snapshots served to the dashboard. They are rebuilt by the IMU loop
+        # and swapped in with a single assignment, so readers never see a
+        # partially updated dict
+        self._calibration_snapshot = {}
+        self._publish_status()
+        
         # Load ONNX model for inference mode
         if mode == 'inference':
             self._load_pretrained_model()
@@ -44,9 +112,9 @@ class HermesIMU:
             if self.anomaly_detector.load_onnx(model_path):
                 print(" ONNX model loaded for edge inference")
             else:
-                print("  ONNX load failed, using PyTorch")
+                print("  ONNX load failed, using the NumPy detector")
         else:
-            print("  No pretrained model found, using PyTorch")
+            print("  No pretrained model found, using the NumPy detector")
             print("Run training first: python training_protocol.py")
         
     def run(self):
@@ -55,17 +123,16 @@ class HermesIMU:
         
         # Warm-up period
         print("Calibrating... (keep device stationary)")
-        warmup_samples = []
-        for _ in range(500):  
+        # Axis-major: rows 0-2 accel x/y/z, rows 3-5 gyro x/y/z
+        warmup_samples = np.empty((6, 500), dtype=np.float32)
+        for k in range(500):  
             data = self.imu.read_raw()
-            warmup_samples.append((data.accel, data.gyro))
+            warmup_samples[0:3, k] = data.accel
+            warmup_samples[3:6, k] = data.gyro
             time.sleep(0.01)
         
         # Initial calibration
-        accel_array = np.array([a for a, _ in warmup_samples])
-        gyro_array = np.array([g for _, g in warmup_samples])
-        self.calibrator.window.extend(list(zip(accel_array, gyro_array)))
-        self.calibrator._auto_calibrate()
+        self.calibrator.ingest_batch(warmup_samples[0:3].T, warmup_samples[3:6].T)
         
         # Apply calibration
         calib = self.calibrator.get_calibration()
@@ -75,6 +142,10 @@ class HermesIMU:
             calib['accel_scale'],
             calib['gyro_scale']
         )
+        self._publish_calibration()
+        
+        # Compile the filter kernels now rather than on the first live sample
+        self.ekf.warmup()
         
         print("Learning normal motion patterns...")
         self._collect_training_data()
@@ -82,24 +153,35 @@ class HermesIMU:
         print("Agent active - monitoring motion...")
         
         window_size = 100  
-        accel_window = []
-        gyro_window = []
+        # Mirrored, axis-major ring buffers: each sample is written at
+        # column pos and pos + window_size, so the latest window is always
+        # columns [pos + 1, pos + 1 + window_size) and needs no copy
+        accel_window = np.empty((3, 2 * window_size), dtype=np.float32)
+        gyro_window = np.empty((3, 2 * window_size), dtype=np.float32)
+        n_seen = 0
+        
+        # Pacing against absolute monotonic deadlines, so a slow iteration
+        # doesn't shift every later sample and wall-clock jumps don't matter
+        period_ns = 10_000_000  # 100Hz
+        next_deadline = time.monotonic_ns()
         
         while True:
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             
             data = self.imu.read_raw()
             
-            self.ekf.predict(data.gyro, data.accel)
-            self.ekf.update(data.accel)
+            self.ekf.step(data.gyro, data.accel)
             
-            accel_window.append(data.accel)
-            gyro_window.append(data.gyro)
+            pos = n_seen % window_size
+            accel_window[:, pos] = accel_window[:, pos + window_size] = data.accel
+            gyro_window[:, pos] = gyro_window[:, pos + window_size] = data.gyro
+            n_seen += 1
             
-            if len(accel_window) >= window_size:
+            if n_seen >= window_size:
+                start = pos + 1
                 signature = self.signature_extractor.extract(
-                    np.array(accel_window[-window_size:]),
-                    np.array(gyro_window[-window_size:])
+                    accel_window[:, start:start + window_size].T,
+                    gyro_window[:, start:start + window_size].T
                 )
                 
                 anomaly_result = self.anomaly_detector.detect(signature)
@@ -107,72 +189,73 @@ class HermesIMU:
                 if anomaly_result['is_anomaly']:
                     self._log_anomaly(signature, anomaly_result)
                 
-                self.signature_history.append({
-                    'timestamp': datetime.utcnow().isoformat(),
-                    'signature': signature.tolist(),
-                    'anomaly_score': anomaly_result['anomaly_score'],
-                    'orientation': self.ekf.state[0:4].tolist(),
-                    'velocity': self.ekf.state[7:10].tolist()
-                })
-                
-                if len(self.signature_history) > 1000:
-                    self.signature_history = self.signature_history[-1000:]
+                self._record_signature(signature, anomaly_result['anomaly_score'])
             
             self.stats['samples_processed'] += 1
-            processing_time = time.time() - start_time
+            processing_time = (time.perf_counter_ns() - start_ns) / 1e9
             self.stats['avg_processing_time'] = (
                 0.99 * self.stats['avg_processing_time'] + 
                 0.01 * processing_time
             )
             
-            time.sleep(max(0, 0.01 - processing_time))
+            # Refresh the dashboard snapshot at 20Hz
+            if self.stats['samples_processed'] % 5 == 0:
+                self._publish_status()
+            
+            next_deadline += period_ns
+            delay = next_deadline - time.monotonic_ns()
+            if delay > 0:
+                time.sleep(delay / 1e9)
+            elif delay < -period_ns:
+                # More than a period behind: resynchronize instead of
+                # bursting through the missed samples
+                next_deadline = time.monotonic_ns()
     
     def _collect_training_data(self):
         """Collect normal operation data for training"""
         print("Move device in normal operating patterns for 30 seconds...")
         print("Show the device its typical motions and usage patterns")
         
-        accel_windows = []
-        gyro_windows = []
+        window_size = 100
+        max_windows = 100
+        
+        # Raw windows are stored axis-major as they fill and turned into
+        # signatures in one batch afterwards, so extraction never stalls
+        # sampling
+        accel_windows = np.empty((max_windows, 3, window_size), dtype=np.float32)
+        gyro_windows = np.empty((max_windows, 3, window_size), dtype=np.float32)
+        n_windows = 0
+        pos = 0
         
         start_time = time.time()
-        window_size = 100
-        current_accel = []
-        current_gyro = []
         
         while time.time() - start_time < 30:
             data = self.imu.read_raw()
             
-            current_accel.append(data.accel)
-            current_gyro.append(data.gyro)
+            accel_windows[n_windows, :, pos] = data.accel
+            gyro_windows[n_windows, :, pos] = data.gyro
+            pos += 1
             
-            if len(current_accel) >= window_size:
-                # Store complete window with real accel and gyro data
-                accel_windows.append(np.array(current_accel))
-                gyro_windows.append(np.array(current_gyro))
-                
-                # Extract signature from real IMU data
-                signature = self.signature_extractor.extract(
-                    np.array(current_accel), 
-                    np.array(current_gyro)
-                )
-                
-                self.signature_history.append(signature)
+            if pos == window_size:
+                n_windows += 1
+                pos = 0
                 
-                # Reset for next window
-                current_accel = []
-                current_gyro = []
+                print(f"Collected {n_windows} training samples...")
                 
-                print(f"Collected {len(self.signature_history)} training samples...")
-                
-                if len(self.signature_history) >= 100:
+                if n_windows >= max_windows:
                     print("Training data collection complete!")
                     break
             
             time.sleep(0.01)
         
-        if len(self.signature_history) > 50:
-            X_train = np.array(self.signature_history)
+        # Extract signatures from the real IMU windows
+        signatures = self.signature_extractor.extract_batch(
+            accel_windows[:n_windows].swapaxes(1, 2),
+            gyro_windows[:n_windows].swapaxes(1, 2)
+        )
+        
+        if len(signatures) > 50:
+            X_train = signatures
             self.anomaly_detector.build_model()
             self.anomaly_detector.train(X_train)
             print(f"Anomaly detector trained on {len(X_train)} real motion samples")
@@ -182,35 +265,85 @@ class HermesIMU:
     def _log_anomaly(self, signature, anomaly_result):
         """Log anomaly with full context"""
         anomaly_log = {
-            'timestamp': datetime.utcnow().isoformat(),
-            'signature': signature.tolist(),
+            'timestamp': datetime.now(timezone.utc).replace(tzinfo=None).isoformat(),
+            'signature': signature,
             'anomaly_score': anomaly_result['anomaly_score'],
             'reconstruction_error': anomaly_result['reconstruction_error'],
-            'orientation': self.ekf.state[0:4].tolist(),
-            'velocity': self.ekf.state[7:10].tolist(),
+            'orientation': self.ekf.state[0:4],
+            'velocity': self.ekf.state[7:10],
             'system_state': self.stats.copy()
         }
         
         try:
-            with open('anomalies.jsonl', 'a') as f:
-                f.write(json.dumps(anomaly_log) + '\n')
+            _append_anomaly(orjson.dumps(anomaly_log, option=orjson.OPT_SERIALIZE_NUMPY) + b'\n')
         except Exception as e:
             print(f"Failed to log anomaly: {e}")
         
         self.stats['anomalies_detected'] += 1
         print(f" ANOMALY DETECTED! Score: {anomaly_result['anomaly_score']:.3f}")
     
-    def get_status(self):
-        """Get current system status"""
-        return {
-            'orientation': self.ekf.state[0:4].tolist(),
-            'position': self.ekf.state[4:7].tolist(),
-            'velocity': self.ekf.state[7:10].tolist(),
+    def _publish_status(self):
+        """
+        Rebuild the status snapshot from the current filter state. Arrays
+        are copied rather than converted to lists; the dashboard's own
+        ORJSONResponse (dashboard/web_ui.py) serializes them with
+        OPT_SERIALIZE_NUMPY
+        """
+        self._status_snapshot = {
+            'orientation': self.ekf.state[0:4].copy(),
+            'position': self.ekf.state[4:7].copy(),
+            'velocity': self.ekf.state[7:10].copy(),
             'calibrated': self.calibrator.is_calibrated,
-            'stats': self.stats,
-            'latest_signature': self.signature_history[-1] if self.signature_history else None
+            'stats': self.stats.copy(),
+            'latest_signature': self._latest_signature()
         }
+    
+    def _record_signature(self, signature, anomaly_score):
+        """Store a window's signature and filter state in the history ring"""
+        i = self._sig_pos % len(self._sig_ring)
+        self._sig_ring[i] = signature
+        self._sig_time[i] = time.time_ns()
+        self._sig_score[i] = anomaly_score
+        self._sig_orientation[i] = self.ekf.state[0:4]
+        self._sig_velocity[i] = self.ekf.state[7:10]
+        self._sig_pos += 1
+    
+    def _latest_signature(self):
+        """
+        Most recent history entry as a dict, or None before the first window.
+        Timestamps are kept as integer nanoseconds and only formatted here
+        """
+        if self._sig_pos == 0:
+            return None
+        i = (self._sig_pos - 1) % len(self._sig_ring)
+        timestamp = datetime.fromtimestamp(self._sig_time[i] / 1e9, tz=timezone.utc)
+        return {
+            'timestamp': timestamp.replace(tzinfo=None).isoformat(),
+            'signature': self._sig_ring[i].copy(),
+            'anomaly_score': float(self._sig_score[i]),
+            'orientation': self._sig_orientation[i].copy(),
+            'velocity': self._sig_velocity[i].copy()
+        }
+    
+    def _publish_calibration(self):
+        """Rebuild the calibration snapshot after calibration changes"""
+        self._calibration_snapshot = {
+            key: np.asarray(value).tolist()
+            for key, value in self.calibrator.get_calibration().items()
+        }
+    
+    def get_status(self):
+        """
+        Get current system status. orientation, position, velocity and the
+        latest_signature arrays are float32 ndarrays, not lists
+        """
+        return self._status_snapshot
+    
+    def get_calibration(self):
+        """Get the most recently applied calibration"""
+        return self._calibration_snapshot
 
 if __name__ == "__main__":
+    signal.signal(signal.SIGTERM, _handle_sigterm)
     hermes = HermesIMU()
     hermes.run()
\ No newline at end of file
@@ -1,38 +1,21 @@
+import inspect
+import logging
+import os
 import numpy as np
 from sklearn.preprocessing import StandardScaler
-import torch
-import torch.nn as nn
-import torch.optim as optim
-import onnx
-import onnxruntime as ort
 
+logger = logging.getLogger(__name__)
 
-class Autoencoder(nn.Module):
-    """
-    Physics-aware autoencoder for anomaly detection
-    Learns normal motion patterns from physics-based features
-    """
-    def __init__(self, input_dim, latent_dim):
-        super().__init__()
-        # Encoder: compress physics features to latent space
-        self.encoder = nn.Sequential(
-            nn.Linear(input_dim, 16),
-            nn.ReLU(),
-            nn.Linear(16, latent_dim),
-            nn.ReLU()
-        )
-        
-        # Decoder: reconstruct physics features from latent space
-        self.decoder = nn.Sequential(
-            nn.Linear(latent_dim, 16),
-            nn.ReLU(),
-            nn.Linear(16, input_dim)
-        )
+# torch and onnxruntime are imported by the methods that use them, so
+# NumPy/ONNX inference never pays for loading the training stack
 
-    def forward(self, x):
-        encoded = self.encoder(x)
-        decoded = self.decoder(encoded)
-        return decoded
+
+def __getattr__(name):
+    # Autoencoder lives with the torch imports in ml.autoencoder_model
+    if name == 'Autoencoder':
+        from ml.autoencoder_model import Autoencoder
+        return Autoencoder
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class AnomalyDetector:
@@ -46,10 +29,19 @@ class AnomalyDetector:
         self.scaler = StandardScaler()
         self.model = None
         self.encoder = None
-        self.device = torch.device("cpu")
+        self.device = "cpu"
 
     def build_model(self):
         """Build physics-aware autoencoder"""
+        import torch
+        import torch.nn as nn
+        import torch.optim as optim
+        from ml.autoencoder_model import Autoencoder
+        
+        # The layers are a few hundred MACs wide; intra-op threading only
+        # adds synchronization on a small edge CPU
+        torch.set_num_threads(1)
+        
         self.model = Autoencoder(self.input_dim, self.latent_dim).to(self.device)
         self.encoder = self.model.encoder
         self.criterion = nn.MSELoss()
@@ -57,8 +49,16 @@ class AnomalyDetector:
 
     def train(self, normal_data, epochs=50):
         """Train on physics-based motion features"""
+        import torch
+        
         # Scale physics features
         X_scaled = self.scaler.fit_transform(normal_data)
+        
+        # float32 copies for scaling single samples at detection time,
+        # bypassing the scaler's per-call validation
+        self._mean = self.scaler.mean_.astype(np.float32)
+        self._inv_scale = (1.0 / self.scaler.scale_).astype(np.float32)
+        
         X_tensor = torch.tensor(X_scaled, dtype=torch.float32).to(self.device)
 
         self.model.train()
@@ -72,20 +72,66 @@ class AnomalyDetector:
         # Set anomaly threshold based on physics-based reconstruction
         self.model.eval()
         with torch.no_grad():
-            reconstructions = self.model(X_tensor)
-            mse = np.mean((X_scaled - reconstructions.cpu().numpy()) ** 2, axis=1)
-            self.threshold = np.percentile(mse, 95)
+            # The reconstruction is a fresh tensor, so it can be turned into
+            # the squared error in place
+            mse = self.model(X_tensor).sub_(X_tensor).pow_(2).mean(dim=1)
+            self.threshold = float(np.percentile(mse.cpu().numpy(), 95))
+
+        self._cache_weights()
 
         return None
 
+    def _cache_weights(self):
+        """
+        Snapshot the trained layers as float32 (W^T, b) pairs for the NumPy
+        forward pass, which avoids tensor creation and autograd dispatch on
+        the per-window detection path.
+
+        The scaler is folded into the first layer, W1' = W1 / scale and
+        b1' = b1 - (mean / scale) W1, so the forward pass takes raw
+        features. That layer stays in float64: signature features sit far
+        from their means (gravity, spectral power), and the subtraction
+        cancels too much precision in float32
+        """
+        import torch.nn as nn
+        
+        layers = [m for m in self.model.modules() if isinstance(m, nn.Linear)]
+        self._np_weights = [
+            (layer.weight.detach().cpu().numpy().T.astype(np.float32),
+             layer.bias.detach().cpu().numpy().astype(np.float32))
+            for layer in layers
+        ]
+        
+        W1, b1 = self._np_weights[0]
+        inv_scale = 1.0 / self.scaler.scale_
+        self._input_layer = (
+            W1 * inv_scale[:, None],
+            b1 - (self.scaler.mean_ * inv_scale) @ W1
+        )
+
+    def _forward_np(self, x):
+        """
+        Autoencoder forward pass in NumPy on raw (unscaled) features: ReLU
+        after every layer but the last
+        """
+        W, b = self._input_layer
+        x = x @ W
+        x += b
+        x = np.maximum(x, 0).astype(np.float32)
+        for W, b in self._np_weights[1:-1]:
+            x = x @ W
+            x += b
+            np.maximum(x, 0, out=x)
+        W, b = self._np_weights[-1]
+        return x @ W + b
+
     def detect(self, features):
         """Detect anomaly in new sample"""
-        X_scaled = self.scaler.transform(features.reshape(1, -1))
-        X_tensor = torch.tensor(X_scaled, dtype=torch.float32).to(self.device)
-
-        self.model.eval()
-        with torch.no_grad():
-            reconstruction = self.model(X_tensor).cpu().numpy()
+        features = features.reshape(1, -1)
+        reconstruction = self._forward_np(features)
+        
+        # The scaled input is still needed as the reconstruction target
+        X_scaled = (features.astype(np.float32) - self._mean) * self._inv_scale
 
         mse = np.mean((X_scaled - reconstruction) ** 2)
 
@@ -98,14 +144,25 @@ class AnomalyDetector:
             'threshold': float(self.threshold)
         }
     
-    def export_onnx(self, model_path="models/anomaly_detector.onnx"):
-        """Export trained model to ONNX for edge deployment"""
+    def export_onnx(self, model_path="models/anomaly_detector.onnx", quantize=True):
+        """
+        Export trained model to ONNX for edge deployment. With quantize, an
+        int8 copy is also written alongside it (see quantize_onnx)
+        """
         if self.model is None:
             raise ValueError("Model not trained. Call train() first.")
         
+        import torch
+        
         # Create dummy input for tracing
         dummy_input = torch.randn(1, self.input_dim).to(self.device)
         
+        # Recent torch defaults to the dynamo exporter, whose opset-18 graphs
+        # fail quantize_dynamic's shape inference; keep the TorchScript one
+        export_kwargs = {}
+        if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+            export_kwargs['dynamo'] = False
+        
         # Export to ONNX
         torch.onnx.export(
             self.model,
@@ -116,18 +173,59 @@ class AnomalyDetector:
             do_constant_folding=True,
             input_names=['input'],
             output_names=['output'],
-            dynamic_axes={'input': {0: 'batch_size'}, 'output': {0: 'batch_size'}}
+            dynamic_axes={'input': {0: 'batch_size'}, 'output': {0: 'batch_size'}},
+            **export_kwargs
         )
         
         print(f"✅ Model exported to {model_path}")
+        
+        if quantize:
+            self.quantize_onnx(model_path)
+        
         return model_path
     
-    def load_onnx(self, model_path="models/anomaly_detector.onnx"):
-        """Load ONNX model for inference"""
+    def quantize_onnx(self, model_path="models/anomaly_detector.onnx"):
+        """
+        Write an int8 dynamically quantized copy of an exported model to
+        <name>_int8.onnx. Weights are stored as int8 and the matmuls run as
+        integer kernels, with activations quantized on the fly
+        """
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        
+        quantized_path = model_path.replace('.onnx', '_int8.onnx')
+        try:
+            quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+        except Exception as e:
+            logger.warning("INT8 quantization of %s failed, keeping fp32 model only: %s",
+                           model_path, e)
+            return None
+        
+        print(f"✅ INT8 model exported to {quantized_path}")
+        return quantized_path
+    
+    def load_onnx(self, model_path="models/anomaly_detector.onnx", prefer_int8=True):
+        """
+        Load ONNX model for inference. If an int8 copy written by
+        quantize_onnx exists next to model_path it is used instead
+        """
+        import onnxruntime as ort
+        
+        quantized_path = model_path.replace('.onnx', '_int8.onnx')
+        if prefer_int8 and os.path.exists(quantized_path):
+            model_path = quantized_path
+        
         try:
+            # Full graph optimization, and a single thread: the matmuls are
+            # far too small to amortize a thread pool on an edge CPU
+            session_options = ort.SessionOptions()
+            session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            session_options.intra_op_num_threads = 1
+            session_options.inter_op_num_threads = 1
+            
             # Load ONNX model
             self.onnx_session = ort.InferenceSession(
                 model_path,
+                sess_options=session_options,
                 providers=['CPUExecutionProvider']
             )
             
@@ -145,12 +243,12 @@ class AnomalyDetector:
     def detect_onnx(self, features):
         """Detect anomaly using ONNX model (faster for edge)"""
         if not hasattr(self, 'onnx_session'):
-            # Fallback to PyTorch if ONNX not loaded
+            # Fall back to the NumPy forward pass if ONNX is not loaded
             return self.detect(features)
         
         # Prepare input
-        X_scaled = self.scaler.transform(features.reshape(1, -1))
-        input_data = X_scaled.astype(np.float32)
+        X_scaled = (features.reshape(1, -1).astype(np.float32) - self._mean) * self._inv_scale
+        input_data = X_scaled
         
         # Run inference
         outputs = self.onnx_session.run(
@@ -0,0 +1,29 @@
+import torch.nn as nn
+
+
+class Autoencoder(nn.Module):
+    """
+    Physics-aware autoencoder for anomaly detection
+    Learns normal motion patterns from physics-based features
+    """
+    def __init__(self, input_dim, latent_dim):
+        super().__init__()
+        # Encoder: compress physics features to latent space
+        self.encoder = nn.Sequential(
+            nn.Linear(input_dim, 16),
+            nn.ReLU(),
+            nn.Linear(16, latent_dim),
+            nn.ReLU()
+        )
+        
+        # Decoder: reconstruct physics features from latent space
+        self.decoder = nn.Sequential(
+            nn.Linear(latent_dim, 16),
+            nn.ReLU(),
+            nn.Linear(16, input_dim)
+        )
+
+    def forward(self, x):
+        encoded = self.encoder(x)
+        decoded = self.decoder(encoded)
+        return decoded
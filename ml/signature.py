@@ -1,7 +1,177 @@
 import numpy as np
+import scipy.fft
 from scipy.fft import rfft, rfftfreq
-from scipy.signal import welch
-import pywt
+from numba import njit, prange
+
+# Use FFTW for the spectra when pyfftw is installed, with its plan cache on
+# so repeated window lengths reuse their plans. The backend is only set
+# around signature extraction (see extract_batch), never process-wide
+try:
+    import pyfftw.interfaces.cache
+    import pyfftw.interfaces.scipy_fft
+except ImportError:
+    _FFT_BACKEND = 'scipy'
+else:
+    pyfftw.interfaces.cache.enable()
+    _FFT_BACKEND = pyfftw.interfaces.scipy_fft
+
+# Daubechies-4 analysis filters (the same taps as pywt's 'db4' dec_lo/dec_hi)
+_DB4_LO = np.array([
+    -0.010597401785069032, 0.0328830116668852, 0.030841381835560764,
+    -0.18703481171909309, -0.027983769416859854, 0.6308807679298589,
+    0.7148465705529157, 0.2303778133088965,
+])
+_DB4_HI = np.array([
+    -0.2303778133088965, 0.7148465705529157, -0.6308807679298589,
+    -0.027983769416859854, 0.18703481171909309, 0.030841381835560764,
+    -0.0328830116668852, -0.010597401785069032,
+])
+
+
+@njit(cache=True, fastmath=True)
+def _time_feats(data, out):
+    """
+    Single pass over an axis-major (axes, N) window: RMS, peak-to-peak,
+    crest factor, mean absolute value and zero-crossing rate, taken over all
+    samples and written to out[0:5]. Zero crossings are sign changes along
+    time, counted per axis; each sample's sign is reduced to -1/0/+1 and
+    compared with its predecessor's, which compiles without branches.
+    Returns the plain sample sum, for the central moments of _skew_kurt
+    """
+    m, n = data.shape
+    s_sum = 0.0
+    s_sq = 0.0
+    s_abs = 0.0
+    lo = data[0, 0]
+    hi = data[0, 0]
+    crossings = 0
+
+    for j in range(m):
+        row = data[j]
+        prev_sign = np.int32(row[0] > 0) - np.int32(row[0] < 0)
+        for i in range(n):
+            v = row[i]
+            s_sum += v
+            s_sq += v * v
+            s_abs += abs(v)
+            lo = min(lo, v)
+            hi = max(hi, v)
+            sign = np.int32(v > 0) - np.int32(v < 0)
+            crossings += sign != prev_sign
+            prev_sign = sign
+
+    rms = np.sqrt(s_sq / (n * m))
+    peak = max(hi, -lo)
+    out[0] = rms
+    out[1] = hi - lo
+    out[2] = peak / rms if rms > 0 else 0.0
+    out[3] = s_abs / n
+    out[4] = crossings / n
+    return s_sum
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _time_feats_batch(batch, out):
+    """
+    _time_feats over each window of a (B, axes, N) batch into (B, 5) out,
+    with the windows spread over the Numba thread pool
+    """
+    for b in prange(batch.shape[0]):
+        _time_feats(batch[b], out[b])
+
+
+@njit(cache=True, fastmath=True)
+def _skew_kurt(data, mean, out):
+    """
+    Kurtosis and skewness of all samples of a window into out[0:2], from
+    one pass accumulating the 2nd-4th central moments about mean. The mean
+    comes from the sample sum of the _time_feats pass over the same window
+    """
+    m, n = data.shape
+    s2 = 0.0
+    s3 = 0.0
+    s4 = 0.0
+    for j in range(m):
+        for i in range(n):
+            d = data[j, i] - mean
+            d2 = d * d
+            s2 += d2
+            s3 += d2 * d
+            s4 += d2 * d2
+
+    var = s2 / (m * n)
+    if var > 0:
+        out[0] = (s4 / (m * n)) / (var * var)
+        out[1] = (s3 / (m * n)) / (var * np.sqrt(var))
+    else:
+        out[0] = 0.0
+        out[1] = 0.0
+
+
+@njit(cache=True, fastmath=True)
+def _time_stat_feats(data, time_out, stats_out):
+    """_time_feats into time_out, then _skew_kurt about its mean into stats_out"""
+    total = _time_feats(data, time_out)
+    _skew_kurt(data, total / data.size, stats_out)
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _time_stat_feats_batch(batch, time_out, stats_out):
+    """_time_stat_feats over each window of a (B, axes, N) batch, in parallel"""
+    for b in prange(batch.shape[0]):
+        _time_stat_feats(batch[b], time_out[b], stats_out[b])
+
+
+@njit(cache=True, fastmath=True)
+def _dwt_db4(x, approx):
+    """
+    One level of the db4 DWT with half-sample symmetric extension, matching
+    pywt.dwt(x, 'db4', mode='symmetric'): coefficient i is the filter
+    applied at x[2i + 1 - j], j = 0..7, with indices reflected at the ends.
+    The approximation is written to approx; detail coefficients are only
+    needed for their energy, so just their sum of squares is returned.
+    
+    The reflection is resolved once into a padded copy of x (6 samples on
+    the left, 7 on the right), so the filter loop itself has no index
+    arithmetic or boundary branches
+    """
+    n = x.shape[0]
+    padded = np.empty(n + 13)
+    for k in range(n + 13):
+        t = (k - 6) % (2 * n)
+        if t >= n:
+            t = 2 * n - 1 - t
+        padded[k] = x[t]
+
+    detail_sq = 0.0
+    for i in range(approx.shape[0]):
+        a = 0.0
+        d = 0.0
+        for j in range(8):
+            v = padded[2 * i + 7 - j]
+            a += _DB4_LO[j] * v
+            d += _DB4_HI[j] * v
+        approx[i] = a
+        detail_sq += d * d
+    return detail_sq
+
+
+@njit(cache=True, fastmath=True)
+def _db4_energies(signal):
+    """
+    Mean energy sum(c^2) / len(c) of each band of a 3-level db4
+    decomposition, in pywt.wavedec order: (cA3, cD3, cD2, cD1)
+    """
+    energies = np.empty(4)
+    x = signal.astype(np.float64)
+    for level in range(3):
+        m = (x.shape[0] + 7) // 2
+        approx = np.empty(m)
+        energies[3 - level] = _dwt_db4(x, approx) / m
+        x = approx
+    energies[0] = np.sum(x * x) / x.shape[0]
+    return energies
+
 
 class MotionSignature:
     """
@@ -12,153 +182,254 @@ class MotionSignature:
         self.fs = fs
         self.feature_names = []
         
+        # Compile the time-domain and moment kernels up front, both the
+        # single-window and the parallel batch entry points, for the column
+        # slices of the signature array they write into. The single-window
+        # kernels are also compiled for strided windows (see extract_batch)
+        scratch = np.zeros((2, 3, 2), dtype=np.float32)
+        out = np.empty((2, 32), dtype=np.float32)
+        _time_feats(scratch[0], out[0, 0:5])
+        _time_stat_feats(scratch[0], out[0, 0:5], out[0, 17:19])
+        _time_feats(scratch[0, :, :1], out[0, 0:5])
+        _time_stat_feats(scratch[0, :, :1], out[0, 0:5], out[0, 17:19])
+        _time_feats_batch(scratch, out[:, 0:5])
+        _time_stat_feats_batch(scratch, out[:, 0:5], out[:, 17:19])
+        
+        # Spectrum plans (window, PSD weights, band edges) keyed by window length
+        self._spectrum_plans = {}
+        self._bands = [(0, 5), (5, 20), (20, 50), (50, 100)]
+        
     def extract(self, accel_window, gyro_window):
         """
         Extract 32-dimensional physics-based motion signature
         Features based on physical properties of motion
         """
-        features = []
+        return self.extract_batch(accel_window[None], gyro_window[None])[0]
+    
+    def extract_batch(self, accel_batch, gyro_batch):
+        """
+        Signatures for a stack of windows: (B, N, 3) accel and gyro batches
+        give a (B, 32) array, row b equal to extract() of window b. Every
+        feature group is computed for the whole batch at once.
+        
+        Features are computed on an axis-major (B, 3, N) float32 layout, in
+        which each axis is a unit-stride time series; the axes themselves
+        may be any distance apart. So float32 samples kept axis-major, e.g.
+        .T of a (3, N) slice of a wider (3, M) ring, are used in place, while
+        other inputs are repacked once. The signatures are float32 as well;
+        the sensor noise is far above float32 resolution
+        """
+        accel_batch = self._axis_major(accel_batch)
+        gyro_batch = self._axis_major(gyro_batch)
+        
+        # Batched FFTs are split over all cores; a single live window stays
+        # on the calling thread
+        with scipy.fft.set_backend(_FFT_BACKEND), \
+                scipy.fft.set_workers(-1 if len(accel_batch) > 1 else 1):
+            return self._extract_batch(accel_batch, gyro_batch)
+    
+    def _axis_major(self, batch):
+        """
+        (B, N, 3) batch as a (B, 3, N) float32 view when its time axis is
+        already unit-stride float32, else as a contiguous float32 copy
+        """
+        batch = np.swapaxes(batch, 1, 2)
+        if batch.dtype != np.float32 or batch.strides[2] != batch.itemsize:
+            batch = np.ascontiguousarray(batch, dtype=np.float32)
+        return batch
+    
+    def _extract_batch(self, accel_batch, gyro_batch):
+        """
+        Signature rows of axis-major (B, 3, N) float32 batches. Each feature
+        group writes straight into its columns of the one output array
+        """
+        signature = np.zeros((len(accel_batch), 32), dtype=np.float32)
         
-        # Time-domain physics features
-        features.extend(self._physics_time_features(accel_window, 'accel'))
-        features.extend(self._physics_time_features(gyro_window, 'gyro'))
+        # Time-domain physics features, with the accelerometer's statistical
+        # moments (motion consistency) sharing its pass over the data
+        self._physics_time_statistical_features(accel_batch, signature[:, 0:5],
+                                                signature[:, 17:19])
+        self._physics_time_features(gyro_batch, 'gyro', signature[:, 5:10])
         
         # Frequency-domain analysis (vibration characteristics)
-        features.extend(self._physics_frequency_features(accel_window, 'accel'))
-        
-        # Statistical properties (motion consistency)
-        features.extend(self._physics_statistical_features(accel_window))
+        self._physics_frequency_features(accel_batch, 'accel', signature[:, 10:17])
         
         # Energy and power features (physical work)
-        features.extend(self._physics_energy_features(accel_window, gyro_window))
+        self._physics_energy_features(accel_batch, gyro_batch, signature[:, 19:24])
         
         # Orientation and gravity features
-        features.extend(self._physics_orientation_features(accel_window))
+        self._physics_orientation_features(accel_batch, signature[:, 24:32])
         
-        return np.array(features)
+        return signature
     
-    def _physics_time_features(self, data, sensor_type):
-        """Extract time-domain physics features"""
-        features = []
-        
-        features.append(np.sqrt(np.mean(data**2)))
-        
-        features.append(np.ptp(data))
-        
-        rms = np.sqrt(np.mean(data**2))
-        peak = np.max(np.abs(data))
-        features.append(peak / rms if rms > 0 else 0)
-        
-        features.append(np.sum(np.abs(data)) / len(data))
+    def _physics_time_features(self, data, sensor_type, features):
+        """Extract time-domain physics features into features (B, 5)"""
+        if len(data) == 1:
+            # A single live window is not worth a thread pool dispatch
+            _time_feats(data[0], features[0])
+        else:
+            _time_feats_batch(data, features)
+    
+    def _spectrum_plan(self, n):
+        """
+        Precomputed pieces of a Welch estimate with n-sample segments:
+        periodic Hann window, per-bin density scaling (with the one-sided
+        doubling folded in), bin frequencies and band binning (see _band_bins)
+        """
+        plan = self._spectrum_plans.get(n)
+        if plan is None:
+            window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n) / n)
+            freqs = rfftfreq(n, 1 / self.fs)
+            
+            weight = np.full(len(freqs), 1 / (self.fs * np.sum(window**2)))
+            weight[1:len(freqs) - (n % 2 == 0)] *= 2
+            
+            breaks, membership = self._band_bins(freqs)
+            
+            plan = (window.astype(np.float32), weight.astype(np.float32), freqs,
+                    breaks, membership)
+            self._spectrum_plans[n] = plan
+        return plan
+    
+    def _band_bins(self, freqs):
+        """
+        Band powers as np.add.reduceat(psd, breaks) @ membership. The bands
+        are closed intervals that share their edge bins, so the bins are cut
+        at every band boundary and membership (segments x bands, 0/1) adds
+        each segment to every band containing it
+        """
+        lo = np.searchsorted(freqs, [low for low, _ in self._bands], 'left')
+        hi = np.searchsorted(freqs, [high for _, high in self._bands], 'right')
         
-        zero_crossings = np.sum(np.diff(np.sign(data)) != 0)
-        features.append(zero_crossings / len(data))
+        breaks = np.unique(np.concatenate([lo, hi]))
+        breaks = breaks[breaks < len(freqs)]
+        if len(breaks) == 0:
+            return np.zeros(1, dtype=np.intp), np.zeros((1, len(self._bands)))
         
-        return features
+        ends = np.append(breaks[1:], len(freqs))
+        membership = ((breaks[:, None] >= lo) & (ends[:, None] <= hi)).astype(np.float64)
+        return breaks, membership
     
-    def _frequency_features(self, data, sensor_type):
-        """Extract frequency-domain features"""
-        freqs, psd = welch(data, fs=self.fs, nperseg=min(256, len(data)))
-        
-        features = []
+    def _welch_fast(self, data):
+        """
+        Welch PSD along time of a (B, axes, N) batch, summed over axes, with
+        scipy.signal.welch's defaults: Hann segments of min(256, N) samples,
+        50% overlap, per-segment mean removal, density scaling. Everything
+        but the FFT comes from the cached plan. Returns (freqs, psd, plan)
+        """
+        n = data.shape[2]
+        nperseg = min(256, n)
+        plan = self._spectrum_plan(nperseg)
+        window, weight, freqs = plan[0:3]
         
-        dominant_freq = freqs[np.argmax(psd)]
-        features.append(dominant_freq)
+        if n == nperseg:
+            segments = data[:, :, None, :]
+        else:
+            step = nperseg - nperseg // 2
+            segments = np.lib.stride_tricks.sliding_window_view(data, nperseg, axis=2)[:, :, ::step]
+        
+        # Detrend and window in one buffer, and square the spectrum in place
+        tapered = segments - segments.mean(axis=3, keepdims=True)
+        tapered *= window
+        spec = rfft(tapered, axis=3)
+        power = np.square(spec.real)
+        power += np.square(spec.imag)
+        psd = power.mean(axis=2).sum(axis=1)
+        psd *= weight
+        return freqs, psd, plan
+    
+    def _physics_frequency_features(self, data, sensor_type, features):
+        """Extract frequency-domain features into zeroed features (B, 7)"""
+        freqs, psd, plan = self._welch_fast(data)
+        breaks, membership = plan[3:5]
         
-        bands = [(0, 5), (5, 20), (20, 50), (50, 100)]
-        total_power = np.sum(psd)
+        features[:, 0] = freqs[np.argmax(psd, axis=1)]  # Dominant frequency
         
-        for low, high in bands:
-            mask = (freqs >= low) & (freqs <= high)
-            band_power = np.sum(psd[mask])
-            features.append(band_power / total_power if total_power > 0 else 0)
+        total_power = psd.sum(axis=1)
+        has_power = total_power > 0
         
-        features.append(np.sum(freqs * psd) / np.sum(psd) if np.sum(psd) > 0 else 0)
+        band_power = np.add.reduceat(psd, breaks, axis=1) @ membership
+        features[has_power, 1:5] = band_power[has_power] / total_power[has_power, None]
         
-        geometric_mean = np.exp(np.mean(np.log(psd + 1e-10)))
-        arithmetic_mean = np.mean(psd)
-        features.append(geometric_mean / arithmetic_mean if arithmetic_mean > 0 else 0)
+        # Spectral centroid
+        features[has_power, 5] = (psd[has_power] @ freqs) / total_power[has_power]
         
-        return features
+        # Spectral flatness; the arithmetic mean follows from total_power
+        log_psd = psd + 1e-10
+        np.log(log_psd, out=log_psd)
+        geometric_mean = np.exp(log_psd.mean(axis=1))
+        arithmetic_mean = total_power / psd.shape[1]
+        features[has_power, 6] = geometric_mean[has_power] / arithmetic_mean[has_power]
     
-    def _statistical_features(self, data):
-        """Statistical moments"""
-        features = []
-        
-        mean = np.mean(data)
-        std = np.std(data)
-        if std > 0:
-            kurtosis = np.mean((data - mean)**4) / std**4
-        else:
-            kurtosis = 0
-        features.append(kurtosis)
-        
-        if std > 0:
-            skewness = np.mean((data - mean)**3) / std**3
+    def _physics_time_statistical_features(self, data, time_features, stat_features):
+        """
+        Time-domain features (B, 5) and statistical moments (kurtosis,
+        skewness) (B, 2) together; the moments take their mean from the
+        time-domain pass
+        """
+        if len(data) == 1:
+            _time_stat_feats(data[0], time_features[0], stat_features[0])
         else:
-            skewness = 0
-        features.append(skewness)
-        
-        return features
+            _time_stat_feats_batch(data, time_features, stat_features)
     
-    def _physics_energy_features(self, accel_window, gyro_window):
-        """Energy and power features (physical work)"""
-        features = []
-        
-        # Kinetic energy (1/2 * m * v^2)
-        accel_magnitude = np.linalg.norm(accel_window, axis=1)
-        gyro_magnitude = np.linalg.norm(gyro_window, axis=1)
-        
-        # Average energy over window
-        features.append(np.mean(accel_magnitude**2))
-        features.append(np.mean(gyro_magnitude**2))
-        
-        # Power spectral density (energy distribution)
-        accel_fft = np.fft.rfft(accel_window, axis=0)
-        gyro_fft = np.fft.rfft(gyro_window, axis=0)
-        
-        features.append(np.mean(np.abs(accel_fft)**2))
-        features.append(np.mean(np.abs(gyro_fft)**2))
+    def _physics_energy_features(self, accel_window, gyro_window, features):
+        """
+        Energy and power features (physical work) into zeroed features
+        (B, 5). Single-sample windows have no work term and keep its 0
+        """
+        # Kinetic energy (1/2 * m * v^2), as the mean squared magnitude
+        n = accel_window.shape[2]
+        accel_sq = np.einsum('bji,bji->bj', accel_window, accel_window, dtype=np.float64)
+        gyro_sq = np.einsum('bji,bji->bj', gyro_window, gyro_window, dtype=np.float64)
+        features[:, 0] = accel_sq.sum(axis=1) / n
+        features[:, 1] = gyro_sq.sum(axis=1) / n
+        
+        # Power spectral density (energy distribution): mean |rfft|^2 per bin,
+        # taken from Parseval instead of an FFT (see _rfft_power)
+        features[:, 2] = self._rfft_power(accel_window, accel_sq)
+        features[:, 3] = self._rfft_power(gyro_window, gyro_sq)
+        
+        # Mechanical work (force * displacement); the per-step displacement
+        # diff(cumsum(a)) is just a[1:]
+        if n > 1:
+            work = np.einsum('bji,bji->bj', accel_window[:, :, :-1], accel_window[:, :, 1:])
+            features[:, 4] = np.mean(work, axis=1)
+    
+    def _rfft_power(self, data, sum_sq):
+        """
+        Mean of |rfft|^2 along time over bins and axes, from the per-axis
+        sums of squares. Parseval gives sum_k |X_k|^2 = N sum x^2 over the
+        full spectrum; the one-sided half counts every bin twice except DC,
+        X_0 = sum x, and for even N the Nyquist bin, X_N/2 = sum (-1)^n x
+        """
+        n = data.shape[2]
+        n_bins = n // 2 + 1
         
-        # Mechanical work (force * displacement)
-        if len(accel_window) > 1:
-            accel_displacement = np.cumsum(accel_window, axis=0)
-            work = np.sum(accel_window[:-1] * np.diff(accel_displacement, axis=0), axis=0)
-            features.append(np.mean(work))
+        dc = data.sum(axis=2, dtype=np.float64)
+        power = n * sum_sq + dc * dc
+        if n % 2 == 0:
+            nyquist = (data[:, :, 0::2].sum(axis=2, dtype=np.float64)
+                       - data[:, :, 1::2].sum(axis=2, dtype=np.float64))
+            power += nyquist * nyquist
         
-        return features
+        return power.sum(axis=1) / (2 * n_bins * data.shape[1])
     
-    def _physics_orientation_features(self, accel_window):
-        """Orientation and gravity features"""
-        features = []
-        
+    def _physics_orientation_features(self, accel_window, features):
+        """Orientation and gravity features into zeroed features (B, 8)"""
         # Gravity vector estimation (when stationary)
-        gravity_estimate = np.mean(accel_window, axis=0)
-        features.extend(gravity_estimate)
-        
-        # Deviation from expected gravity (9.81 m/s²)
-        gravity_magnitude = np.linalg.norm(gravity_estimate)
-        features.append(abs(gravity_magnitude - 9.81))
+        gravity_estimate = np.mean(accel_window, axis=2)
+        features[:, 0:3] = gravity_estimate
         
         # Tilt angle from gravity components
-        if gravity_magnitude > 0:
-            tilt_x = np.arcsin(gravity_estimate[0] / gravity_magnitude)
-            tilt_y = np.arcsin(gravity_estimate[1] / gravity_magnitude)
-            features.extend([tilt_x, tilt_y])
+        gravity_magnitude = np.linalg.norm(gravity_estimate, axis=1)
+        tilted = gravity_magnitude > 0
+        features[tilted, 3:5] = np.arcsin(
+            gravity_estimate[tilted, 0:2] / gravity_magnitude[tilted, None]
+        )
         
         # Orientation change rate (stability)
-        if len(accel_window) > 10:
-            orientation_variance = np.var(accel_window[-10:], axis=0)
-            features.append(orientation_variance)
-        
-        return features
+        features[:, 5:8] = np.var(accel_window[:, :, -10:], axis=2)
     
     def _wavelet_features(self, signal):
         """Wavelet transform features"""
-        coeffs = pywt.wavedec(signal, 'db4', level=3)
-        features = []
-        
-        for i, coeff in enumerate(coeffs):
-            features.append(np.sum(coeff**2) / len(coeff))
-            
-        return features[:4]
\ No newline at end of file
+        return list(_db4_energies(np.ascontiguousarray(signal)))
@@ -16,15 +16,13 @@ def test_hardware_connection():
         print(" MPU6050 initialized successfully")
         
         print("Reading IMU data for 2 seconds...")
-        data_points = []
-        start_time = time.time()
+        data_array = np.empty((200, 3), dtype=np.float32)
+        next_t = time.perf_counter()
         
-        while time.time() - start_time < 2:
-            data = imu.read_raw()
-            data_points.append(data.accel)
-            time.sleep(0.01)
-        
-        data_array = np.array(data_points)
+        for i in range(200):
+            data_array[i] = imu.read_raw().accel
+            next_t += 0.01
+            time.sleep(max(0.0, next_t - time.perf_counter()))
         
         mean_accel = np.mean(data_array, axis=0)
         std_accel = np.std(data_array, axis=0)
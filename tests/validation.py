@@ -11,13 +11,16 @@ def test_calibration():
     calibrator = SelfCalibrator()
     
     print("Collecting stationary data (5s)...")
-    stationary_data = []
-    for _ in range(500):
-        data = imu.read_raw()
-        stationary_data.append(data.accel)
-        time.sleep(0.01)
+    stationary_data = np.empty((500, 3), dtype=np.float32)
+    next_t = time.perf_counter()
+    for i in range(500):
+        stationary_data[i] = imu.read_raw().accel
+        # Sleep to the next 100Hz deadline rather than a fixed 10ms, so the
+        # read time does not accumulate as drift
+        next_t += 0.01
+        time.sleep(max(0.0, next_t - time.perf_counter()))
     
-    gravity = np.mean(np.linalg.norm(stationary_data, axis=1))
+    gravity = np.sqrt((stationary_data * stationary_data).sum(axis=1)).mean()
     error = abs(gravity - 9.81) / 9.81 * 100
     
     print(f"Gravity measured: {gravity:.3f} m/s²")
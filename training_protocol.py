@@ -5,6 +5,7 @@ Real hardware data collection and validation
 """
 
 import time
+import threading
 import numpy as np
 import json
 from datetime import datetime
@@ -21,22 +22,31 @@ class IMUTrainer:
         self.signature_extractor = MotionSignature(fs=100)
         self.anomaly_detector = AnomalyDetector()
         
+        # Raw samples [accel xyz, gyro xyz] written by the acquisition thread.
+        # The length is a whole number of 100-sample windows, so a window
+        # never wraps around the end
+        self._ring = np.empty((4000, 6), dtype=np.float32)
+        self._write_idx = 0
+        # Exception that stopped the acquisition thread, re-raised by the
+        # collecting thread
+        self._producer_error = None
+        
     def hardware_check(self):
         """Verify IMU is working properly"""
         print("=== HARDWARE VALIDATION ===")
         print("Testing IMU connection...")
         
         try:
-            # Test reading
-            samples = []
+            # Test reading, paced against 100Hz deadlines
+            accel_data = np.empty((100, 3), dtype=np.float32)
+            next_t = time.perf_counter()
             for i in range(100):
-                data = self.imu.read_raw()
-                samples.append(data)
-                time.sleep(0.01)
+                accel_data[i] = self.imu.read_raw().accel
+                next_t += 0.01
+                time.sleep(max(0.0, next_t - time.perf_counter()))
             
             # Check gravity reading
-            accel_data = np.array([s.accel for s in samples])
-            gravity_mag = np.linalg.norm(np.mean(accel_data, axis=0))
+            gravity_mag = np.linalg.norm(accel_data.mean(axis=0))
             error = abs(gravity_mag - 9.81) / 9.81 * 100
             
             print(f"Gravity measured: {gravity_mag:.2f} m/s²")
@@ -53,49 +63,90 @@ class IMUTrainer:
             print(f"❌ Hardware error: {e}")
             return False
     
+    def _producer(self, stop):
+        """
+        Read the IMU at 100Hz into the ring buffer until stop is set. A read
+        error ends the thread and is kept in _producer_error
+        """
+        ring = self._ring
+        next_t = time.perf_counter()
+        try:
+            while not stop.is_set():
+                data = self.imu.read_raw()
+                row = ring[self._write_idx % len(ring)]
+                row[0:3] = data.accel
+                row[3:6] = data.gyro
+                # Publish the row only after it is fully written
+                self._write_idx += 1
+                
+                next_t += 0.01
+                delay = next_t - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -0.01:
+                    # More than a period behind: resynchronize instead of
+                    # bursting through the missed samples
+                    next_t = time.perf_counter()
+        except Exception as e:
+            self._producer_error = e
+    
     def collect_training_data(self, duration=30, motion_type="normal"):
         """Collect real IMU training data"""
         print(f"\n=== COLLECTING {motion_type.upper()} DATA ===")
         print(f"Duration: {duration} seconds")
         print(f"Start moving the device in {motion_type} patterns NOW!")
         
-        accel_windows = []
-        gyro_windows = []
-        signatures = []
-        
         window_size = 100
-        current_accel = []
-        current_gyro = []
+        
+        # Completed windows, sized for the whole session up front (plus
+        # slack for a late stop)
+        windows = np.empty((int(duration * 100) // window_size + 2, window_size, 6),
+                           dtype=np.float32)
+        
+        # Sampling runs on its own thread; this one only takes completed
+        # windows out of the ring, so its pauses do not delay any reads
+        self._write_idx = 0
+        self._producer_error = None
+        stop = threading.Event()
+        producer = threading.Thread(target=self._producer, args=(stop,), daemon=True)
         
         start_time = time.time()
         samples_collected = 0
+        read_idx = 0
+        producer.start()
         
-        while time.time() - start_time < duration:
-            data = self.imu.read_raw()
-            
-            current_accel.append(data.accel)
-            current_gyro.append(data.gyro)
+        while True:
+            done = time.time() - start_time >= duration or not producer.is_alive()
+            if done:
+                stop.set()
+                producer.join()
+                if self._producer_error is not None:
+                    raise self._producer_error
             
-            if len(current_accel) >= window_size:
-                # Complete window collected
-                accel_array = np.array(current_accel)
-                gyro_array = np.array(current_gyro)
-                
-                # Extract signature
-                signature = self.signature_extractor.extract(accel_array, gyro_array)
-                
-                accel_windows.append(accel_array)
-                gyro_windows.append(gyro_array)
-                signatures.append(signature)
+            while (self._write_idx - read_idx >= window_size
+                   and samples_collected < len(windows)):
+                # Complete window collected; signatures are extracted once
+                # acquisition ends
+                start = read_idx % len(self._ring)
+                windows[samples_collected] = self._ring[start:start + window_size]
+                read_idx += window_size
                 
                 samples_collected += 1
                 print(f"Samples collected: {samples_collected}")
-                
-                # Reset for next window
-                current_accel = []
-                current_gyro = []
             
-            time.sleep(0.01)
+            if done:
+                break
+            time.sleep(0.05)
+        
+        # Extract all signatures in one batch
+        windows = windows[:samples_collected]
+        accel_windows = list(windows[:, :, 0:3])
+        gyro_windows = list(windows[:, :, 3:6])
+        signatures = []
+        if samples_collected:
+            signatures = list(self.signature_extractor.extract_batch(
+                windows[:, :, 0:3], windows[:, :, 3:6]
+            ))
         
         print(f"✅ Collected {len(signatures)} {motion_type} samples")
         return accel_windows, gyro_windows, signatures
@@ -145,23 +196,30 @@ class IMUTrainer:
             return False
     
     def save_training_data(self, normal_signatures, anomaly_signatures=None):
-        """Save training data and export ONNX model"""
+        """
+        Save training data and export ONNX model. Signatures go to a
+        compressed .npz as float32 arrays ('normal', 'anomaly'); a small JSON
+        sidecar next to it keeps the timestamp and model config
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        training_data = {
+        metadata = {
             'timestamp': timestamp,
-            'normal_signatures': [sig.tolist() for sig in normal_signatures],
-            'anomaly_signatures': [sig.tolist() for sig in anomaly_signatures] if anomaly_signatures else [],
             'model_config': {
                 'input_dim': 32,
                 'latent_dim': 8
             }
         }
         
-        filename = f"training_data_{timestamp}.json"
+        filename = f"training_data_{timestamp}.npz"
         try:
-            with open(filename, 'w') as f:
-                json.dump(training_data, f, indent=2)
+            np.savez_compressed(
+                filename,
+                normal=np.asarray(normal_signatures, dtype=np.float32).reshape(-1, 32),
+                anomaly=np.asarray(anomaly_signatures or [], dtype=np.float32).reshape(-1, 32),
+            )
+            with open(f"training_data_{timestamp}.json", 'w') as f:
+                json.dump(metadata, f, indent=2)
             print(f"✅ Training data saved to {filename}")
             
             # Export to ONNX for edge deployment
@@ -176,12 +234,19 @@ class IMUTrainer:
         if not accel_windows or not gyro_windows:
             return
         
-        # Combine all windows
-        all_accel = np.vstack(accel_windows)
-        all_gyro = np.vstack(gyro_windows)
+        # Combine all windows into one float32 array each
+        all_accel = np.concatenate(accel_windows, axis=0, dtype=np.float32)
+        all_gyro = np.concatenate(gyro_windows, axis=0, dtype=np.float32)
         
         time_axis = np.arange(len(all_accel)) / 100.0  # 100Hz sampling
         
+        # Line drawing is linear in the point count, so long sessions are
+        # decimated to about 10000 points per trace
+        stride = max(1, len(all_accel) // 10000)
+        time_axis = time_axis[::stride]
+        all_accel = all_accel[::stride]
+        all_gyro = all_gyro[::stride]
+        
         fig, axes = plt.subplots(2, 1, figsize=(12, 8))
         
         # Accelerometer data